@@ -1,10 +1,22 @@
 
 import streamlit as st
-import mysql.connector
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
+
+from neo_utils import (
+    cache_stats,
+    clear_query_cache,
+    current_page,
+    get_css,
+    get_overview,
+    local_query,
+    prefetch_page,
+    prewarm_query_cache,
+    queries,
+    query_categories,
+    show_query,
+    with_script_ctx,
+)
 
 # ----------------------------
 # 1. Streamlit basic setup
@@ -19,208 +31,7 @@ st.set_page_config(
 # ----------------------------
 # 2. Modern Custom CSS
 # ----------------------------
-st.markdown(
-    """
-    <style>
-    /* Global background + typography */
-    .main {
-        background: radial-gradient(circle at top left, #0f172a 0, #020617 45%, #000000 100%);
-        color: #e5e7eb;
-        font-family: "Inter", system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
-    }
-
-    .block-container {
-        padding-top: 1.5rem;
-        padding-bottom: 3rem;
-        padding-left: 2.5rem;
-        padding-right: 2.5rem;
-    }
-
-    /* Sidebar styling */
-    section[data-testid="stSidebar"] {
-        background: rgba(15, 23, 42, 0.94);
-        backdrop-filter: blur(18px);
-        border-right: 1px solid rgba(148, 163, 184, 0.25);
-        color: #e5e7eb;
-    }
-    section[data-testid="stSidebar"] .sidebar-content {
-        padding-top: 1.2rem;
-    }
-
-    .sidebar-header {
-        padding-bottom: 0.5rem;
-    }
-    .sidebar-title {
-        font-weight: 700;
-        font-size: 1.1rem;
-        letter-spacing: .03em;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-        margin-bottom: 0.3rem;
-    }
-    .sidebar-subtitle {
-        font-size: 0.78rem;
-        opacity: 0.75;
-        margin-bottom: 0.8rem;
-    }
-    .sidebar-category-label {
-        font-size: 0.82rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: .08em;
-        opacity: 0.75;
-        margin-top: 0.3rem;
-        margin-bottom: 0.3rem;
-    }
-
-    /* Expander tweaks */
-    details > summary {
-        font-weight: 600;
-        letter-spacing: .04em;
-    }
-
-    /* Hero banner */
-    .hero-card {
-        margin-top: 0.5rem;
-        border-radius: 1.75rem;
-        padding: 1.6rem 2.1rem;
-        background: radial-gradient(circle at top left, #0ea5e9 0, #1d4ed8 40%, #020617 100%);
-        box-shadow:
-            0 22px 45px rgba(15, 23, 42, 0.9),
-            0 0 0 1px rgba(148, 163, 184, 0.25);
-        position: relative;
-        overflow: hidden;
-        color: #f9fafb;
-    }
-    .hero-card::after {
-        content: "";
-        position: absolute;
-        inset: 0;
-        background-image:
-            radial-gradient(circle at 10% 0%, rgba(248, 250, 252, 0.18) 0, transparent 40%),
-            radial-gradient(circle at 90% 100%, rgba(52, 211, 153, 0.16) 0, transparent 55%);
-        opacity: 0.85;
-        pointer-events: none;
-    }
-    .hero-inner {
-        position: relative;
-        z-index: 1;
-        display: flex;
-        flex-direction: column;
-        gap: 0.35rem;
-    }
-    .hero-pill {
-        display: inline-flex;
-        align-items: center;
-        gap: 0.35rem;
-        border-radius: 999px;
-        padding: 0.18rem 0.7rem;
-        font-size: 0.75rem;
-        background: rgba(15, 23, 42, 0.35);
-        border: 1px solid rgba(226, 232, 240, 0.25);
-        width: fit-content;
-    }
-    .hero-title {
-        font-size: clamp(1.8rem, 2.1vw, 2.3rem);
-        font-weight: 800;
-        letter-spacing: .04em;
-    }
-    .hero-subtitle {
-        font-size: 0.95rem;
-        opacity: 0.9;
-        max-width: 720px;
-    }
-
-    /* Metric cards */
-    .metric-row {
-        margin-top: 1.3rem;
-        display: grid;
-        grid-template-columns: repeat(4, minmax(0, 1fr));
-        gap: 1rem;
-    }
-    @media (max-width: 1200px) {
-        .metric-row {
-            grid-template-columns: repeat(2, minmax(0, 1fr));
-        }
-    }
-    @media (max-width: 768px) {
-        .metric-row {
-            grid-template-columns: minmax(0, 1fr);
-        }
-    }
-
-    .metric-card {
-        border-radius: 1.35rem;
-        padding: 1.1rem 1.2rem;
-        background: radial-gradient(circle at top left, rgba(15, 23, 42, 0.9) 0, rgba(15, 23, 42, 0.65) 40%, rgba(15, 23, 42, 0.9) 100%);
-        border: 1px solid rgba(148, 163, 184, 0.4);
-        box-shadow: 0 18px 40px rgba(15, 23, 42, 0.9);
-        position: relative;
-        overflow: hidden;
-        transition: transform 150ms ease-out, box-shadow 150ms ease-out, border-color 150ms ease-out;
-    }
-    .metric-card:hover {
-        transform: translateY(-3px) translateZ(0);
-        box-shadow: 0 24px 50px rgba(15, 23, 42, 0.95);
-        border-color: rgba(96, 165, 250, 0.85);
-    }
-    .metric-label {
-        font-size: 0.78rem;
-        letter-spacing: .12em;
-        text-transform: uppercase;
-        opacity: 1;
-        margin-bottom: 0.3rem;
-    }
-    .metric-value {
-        font-size: 1.6rem;
-        font-weight: 800;
-        line-height: 1.1;
-    }
-    .metric-tag {
-        margin-top: 0.4rem;
-        font-size: 0.78rem;
-        opacity: 1;
-    }
-
-    /* Section headings */
-    .section-heading {
-        margin-top: 2rem;
-        margin-bottom: 0.5rem;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-        font-size: 1.2rem;
-        font-weight: 700;
-    }
-    .section-heading span.icon {
-        display: inline-flex;
-        align-items: center;
-        justify-content: center;
-        width: 26px;
-        height: 26px;
-        border-radius: 999px;
-        background: radial-gradient(circle at 30% 0, #22d3ee 0, #1d4ed8 40%, #020617 100%);
-        box-shadow: 0 10px 25px rgba(15, 23, 42, 0.9);
-        font-size: 0.9rem;
-    }
-    .section-heading-sub {
-        font-size: 0.82rem;
-        opacity: 0.7;
-        margin-bottom: 0.7rem;
-    }
-
-    /* Tables */
-    .stDataFrame {
-        border-radius: 12px;
-        overflow: hidden;
-        box-shadow: 0 16px 35px rgba(15, 23, 42, 0.85);
-    }
-
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+st.markdown(get_css(), unsafe_allow_html=True)
 
 # ----------------------------
 # 3. Header (hero card)
@@ -242,504 +53,277 @@ st.markdown(
 )
 
 # ----------------------------
-# 4. DB helpers
+# 4. Cache controls
 # ----------------------------
-def get_connection():
-    """
-    Create and return a new MySQL/TiDB connection using Streamlit secrets.
-    """
-    return mysql.connector.connect(
-        host=st.secrets["host"],
-        user=st.secrets["user"],
-        password=st.secrets["password"],
-        database=st.secrets["name"],
-        port=st.secrets.get("port", 4000),
-    )
-
-
-def run_query(sql, params=None):
-    """
-    Run a SELECT query and return a pandas DataFrame.
-    The connection is opened and closed inside this function.
-    """
-    conn = None
-    try:
-        conn = get_connection()
-        df = pd.read_sql(sql, conn, params=params)
-        return df
-    except Exception as e:
-        st.error(f"Database query failed: {e}")
-        return pd.DataFrame()
-    finally:
-        if conn is not None:
-            conn.close()
+# Handled before any query runs so the whole page reloads fresh data
+if st.sidebar.button("🔄 Refresh data", help="Clear cached query results"):
+    clear_query_cache()
+    st.session_state.pop("filter_summary", None)
+    st.session_state.pop("filtered_df", None)
 
 # ----------------------------
-# 5. Top metrics (overview)
+# 5. Sidebar – query selection (modern text, same logic)
 # ----------------------------
-try:
-    total_asteroids_df = run_query(
-        "SELECT COUNT(DISTINCT id) AS count FROM asteroids"
-    )
-    total_approaches_df = run_query(
-        "SELECT COUNT(*) AS count FROM close_approach"
-    )
-    hazardous_count_df = run_query(
-        "SELECT COUNT(*) AS count FROM asteroids WHERE is_potentially_hazardous_asteroid = 1"
-    )
-
-    total_asteroids = (
-        int(total_asteroids_df.iloc[0]["count"])
-        if not total_asteroids_df.empty
-        else 0
-    )
-    total_approaches = (
-        int(total_approaches_df.iloc[0]["count"])
-        if not total_approaches_df.empty
-        else 0
+with st.sidebar:
+    st.markdown('<div class="sidebar-header">', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="sidebar-title">🛰 Query Selection</div>',
+        unsafe_allow_html=True,
     )
-    hazardous_count = (
-        int(hazardous_count_df.iloc[0]["count"])
-        if not hazardous_count_df.empty
-        else 0
+    st.markdown(
+        '<div class="sidebar-subtitle">Choose from our comprehensive set of asteroid analysis queries.</div>',
+        unsafe_allow_html=True,
     )
+    st.markdown('</div>', unsafe_allow_html=True)
 
-except Exception as e:
-    st.error(f"⚠️ Database connection failed: {e}")
-    st.info("🔧 Please check your MySQL connection settings in st.secrets.")
-    total_asteroids = total_approaches = hazardous_count = 0
-
-hazard_percentage = (
-    (hazardous_count / total_asteroids * 100) if total_asteroids > 0 else 0
-)
 
-# Modern metric cards
-st.markdown(
-    f"""
-    <div class="metric-row">
-      <div class="metric-card">
-        <div class="metric-label">Total Objects Tracked</div>
-        <div class="metric-value">🪐 {total_asteroids:,}</div>
-        <div class="metric-tag">Unique asteroids observed in 2024</div>
-      </div>
+def select_query(query_label):
+    st.session_state["selected_query"] = query_label
 
-      <div class="metric-card">
-        <div class="metric-label">Close Approaches Recorded</div>
-        <div class="metric-value">🚀 {total_approaches:,}</div>
-        <div class="metric-tag">Earth-approaching events in dataset</div>
-      </div>
 
-      <div class="metric-card">
-        <div class="metric-label">Potentially Hazardous</div>
-        <div class="metric-value">⚠️ {hazardous_count:,}</div>
-        <div class="metric-tag">Objects flagged as PHAs</div>
-      </div>
+# Kept in session_state so the choice survives reruns triggered by other widgets
+st.session_state.setdefault("selected_query", "1. Each  asteroid approach Count")
+for category, queries_list in query_categories.items():
+    with st.sidebar.expander(category):
+        for query_label in queries_list:
+            st.button(
+                query_label,
+                key=f"btn_{query_label}",
+                on_click=select_query,
+                args=(query_label,),
+            )
 
-      <div class="metric-card">
-        <div class="metric-label">Hazard Rate</div>
-        <div class="metric-value">📊 {hazard_percentage:.1f}%</div>
-        <div class="metric-tag">Share of tracked objects exceeding risk threshold</div>
-      </div>
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+selected_query = st.session_state["selected_query"]
 
 # ----------------------------
-# 6. Helper to run + show queries
+# 6. Top metrics (overview)
 # ----------------------------
-def show_query(sql, show_chart=True):
-    """
-    Run the given SQL string, show results as a table,
-    and optionally show a chart based on the data.
-    """
-    try:
-        df = run_query(sql)
-
-        if df.empty:
-            st.warning("No data returned for this query.")
-            return df
-
-        st.dataframe(df, use_container_width=True, height=400)
-
-        if show_chart and len(df) > 0:
-            if (
-                len(df.columns) == 2
-                and df.columns[1] in ["count", "approach_count", "total"]
-            ):
-                fig = px.bar(
-                    df.head(10),
-                    x=df.columns[0],
-                    y=df.columns[1],
-                    title=f"Top 10 - {df.columns[1].replace('_', ' ').title()}",
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif len(df.columns) > 1 and "velocity" in df.columns[1].lower():
-                fig = px.histogram(
-                    df,
-                    x=df.columns[1],
-                    title=f"Distribution of {df.columns[1].replace('_', ' ').title()}",
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-
-        return df
-
-    except Exception as e:
-        st.error(f"❌ Query execution failed: {e}")
-        return pd.DataFrame()
+# The overview and the selected query are independent, so overlap their
+# round-trips; the query result lands in the cache for query_panel below.
+with ThreadPoolExecutor(max_workers=2) as executor:
+    overview_future = executor.submit(with_script_ctx(get_overview))
+    selected_sql = queries[selected_query]["sql"]
+    executor.submit(with_script_ctx(prefetch_page), selected_sql, current_page(selected_sql))
 
-# ----------------------------
-# 7. Query definitions
-# ----------------------------
-queries = {
-    "1. Each  asteroid approach Count": """
-        SELECT neo_reference_id, COUNT(*) AS approach_count
-        FROM close_approach
-        GROUP BY neo_reference_id
-        ORDER BY approach_count DESC
-    """,
-    "2. Avg_velocity of each": """
-        SELECT neo_reference_id, AVG(relative_velocity_km_per_hour) AS avg_velocity
-        FROM close_approach
-        GROUP BY neo_reference_id
-        ORDER BY avg_velocity DESC
-    """,
-    "3. Top 10 fastest asteroids": """
-        SELECT neo_reference_id, MAX(relative_velocity_km_per_hour) AS max_velocity
-        FROM close_approach
-        GROUP BY neo_reference_id
-        ORDER BY max_velocity DESC
-        LIMIT 10
-    """,
-    "4. Hazardous>3 approach": """
-        SELECT ca.neo_reference_id, COUNT(*) AS approach_count
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        WHERE a.is_potentially_hazardous_asteroid = 1
-        GROUP BY ca.neo_reference_id
-        HAVING COUNT(*) > 3
-    """,
-    "5. Most approached month": """
-        SELECT DATE_FORMAT(close_approach_date, '%Y-%m') AS month, COUNT(*) AS count
-        FROM close_approach
-        GROUP BY month
-        ORDER BY count DESC
-        LIMIT 1
-    """,
-    "6. Fastest approach": """
-        SELECT neo_reference_id, MAX(relative_velocity_km_per_hour) AS fastest_speed
-        FROM close_approach
-        GROUP BY neo_reference_id
-        ORDER BY fastest_speed DESC
-        LIMIT 1
-    """,
-    "7. Max estimated diameter order": """
-        SELECT id, name, estimated_diameter_max_km
-        FROM asteroids
-        ORDER BY estimated_diameter_max_km DESC
-    """,
-    "8. Order by Miss distance nearer": """
-        SELECT *
-        FROM close_approach
-        ORDER BY neo_reference_id, close_approach_date
-    """,
-    "9. Closest approach date & miss distance": """
-        SELECT a.name,
-               ca.close_approach_date,
-               MIN(ca.miss_distance_km) AS closest_approach
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        GROUP BY a.id, a.name, ca.close_approach_date
-        ORDER BY closest_approach ASC
-    """,
-    "10. Asteroid > 50k km/h": """
-        SELECT DISTINCT a.name, ca.relative_velocity_km_per_hour
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        WHERE ca.relative_velocity_km_per_hour > 50000
-    """,
-    "11. Approaches per month": """
-        SELECT DATE_FORMAT(close_approach_date, '%Y-%m') AS month, COUNT(*) AS total
-        FROM close_approach
-        GROUP BY month
-        ORDER BY total DESC
-    """,
-    "12. Brightest asteroid": """
-        SELECT id, name, absolute_magnitude_h
-        FROM asteroids
-        ORDER BY absolute_magnitude_h ASC
-        LIMIT 1
-    """,
-    "13. Hazardous vs Non-hazardous count": """
-        SELECT is_potentially_hazardous_asteroid, COUNT(*) AS count
-        FROM asteroids
-        GROUP BY is_potentially_hazardous_asteroid
-    """,
-    "14. Asteroids < 1 LD": """
-        SELECT a.name,
-               ca.close_approach_date,
-               ca.miss_distance_lunar
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        WHERE ca.miss_distance_lunar < 1
-        ORDER BY ca.miss_distance_lunar
-    """,
-    "15. Asteroids < 0.05 AU": """
-        SELECT a.name,
-               ca.close_approach_date,
-               ca.astronomical
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        WHERE ca.astronomical < 0.05
-        ORDER BY ca.astronomical
-    """,
-    "16. Abs_mag range (20-26)": """
-        SELECT COUNT(*) AS asteroid_count
-        FROM asteroids
-        WHERE absolute_magnitude_h BETWEEN 20 AND 26;
-    """,
-    "17. Maximum asteroid diameter": """
-        SELECT
-        a.id,
-        a.name,
-        a.estimated_diameter_max_km,
-        ca.close_approach_date,
-        ca.miss_distance_km
-        FROM asteroids a
-        JOIN close_approach ca
-        ON a.id = ca.neo_reference_id
-        ORDER BY
-        a.estimated_diameter_max_km DESC, ca.close_approach_date ASC;
-    """,
-    "18. Minimum estimated diameter": """
-        SELECT
-        id,
-        name,
-        estimated_diameter_min_km
-        FROM asteroids
-        ORDER BY estimated_diameter_min_km DESC;
-    """,
-    "19. Close approach within last 3 days": """
-        SELECT
-        COUNT(*) AS approaches_last_3_days
-        FROM close_approach
-        WHERE close_approach_date >= CURDATE() - INTERVAL 3 DAY
-        AND close_approach_date <= CURDATE()
-        AND orbiting_body = 'Earth';
-    """,
-    "20. Miss_distance_lunar between 70 -120": """
-        SELECT 
-        neo_reference_id,
-        close_approach_date,
-        miss_distance_lunar,
-        miss_distance_km
-        FROM close_approach
-        WHERE miss_distance_lunar BETWEEN 70 AND 120
-        ORDER BY miss_distance_lunar ASC;
-    """,
-    "21. Orbiting bodies (non-Earth)": """
-        SELECT orbiting_body, COUNT(*) AS count
-        FROM close_approach
-        WHERE orbiting_body != 'Earth'
-        GROUP BY orbiting_body
-        ORDER BY count DESC
-    """,
-    "22. Avg_miss_distance by hazard type": """
-        SELECT a.is_potentially_hazardous_asteroid,
-               AVG(ca.miss_distance_km) AS avg_miss_distance
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        GROUP BY a.is_potentially_hazardous_asteroid
-    """,
-    "23. Top 5 closest approaches": """
-        SELECT a.name,
-               ca.close_approach_date,
-               ca.miss_distance_km
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        ORDER BY ca.miss_distance_km ASC
-        LIMIT 5
-    """,
-    "24. Count of hazardous asteroids": """
-        SELECT COUNT(DISTINCT id) AS hazardous_asteroid_count
-        FROM asteroids
-        WHERE is_potentially_hazardous_asteroid = 1
-    """,
-    "25. Frequent <1 LD asteroids": """
-        SELECT ca.neo_reference_id,
-               a.name,
-               COUNT(*) AS close_pass_count
-        FROM close_approach ca
-        JOIN asteroids a ON ca.neo_reference_id = a.id
-        WHERE ca.miss_distance_lunar < 1
-        GROUP BY ca.neo_reference_id, a.name
-        HAVING COUNT(*) > 1
-        ORDER BY close_pass_count DESC
-    """,
-}
+try:
+    overview = overview_future.result()
+    total_asteroids = overview["total"]
+    total_approaches = overview["approaches"]
+    hazardous_count = overview["hazardous"]
+    hazard_percentage = overview["hazard_pct"]
+
+except Exception as e:
+    st.error(f"⚠️ Database connection failed: {e}")
+    st.info("🔧 Please check your MySQL connection settings in st.secrets.")
+    total_asteroids = total_approaches = hazardous_count = 0
+    hazard_percentage = 0.0
+
+# Native metric cards: Streamlit diffs these instead of re-sending HTML
+metric_cards = [
+    ("Total Objects Tracked", f"🪐 {total_asteroids:,}", "Unique asteroids observed in 2024"),
+    ("Close Approaches Recorded", f"🚀 {total_approaches:,}", "Earth-approaching events in dataset"),
+    ("Potentially Hazardous", f"⚠️ {hazardous_count:,}", "Objects flagged as PHAs"),
+    ("Hazard Rate", f"📊 {hazard_percentage:.1f}%", "Share of tracked objects exceeding risk threshold"),
+]
+for column, (label, value, tag) in zip(st.columns(4), metric_cards):
+    with column.container(border=True):
+        st.metric(label, value)
+        st.caption(tag)
+
+# Background-load the sidebar queries; disable with prewarm = false in secrets
+if st.secrets.get("prewarm", True):
+    prewarm_query_cache()
 
 # ----------------------------
-# 8. Sidebar – query selection (modern text, same logic)
+# 7. Show selected query (section style)
 # ----------------------------
-with st.sidebar:
-    st.markdown('<div class="sidebar-header">', unsafe_allow_html=True)
-    st.markdown(
-        '<div class="sidebar-title">🛰 Query Selection</div>',
-        unsafe_allow_html=True,
-    )
+@st.fragment
+def query_panel():
+    """
+    Selected-query heading, table and chart; reruns on its own and reads the
+    selection from session_state, so filter interactions never re-run it.
+    """
+    selected_query = st.session_state["selected_query"]
     st.markdown(
-        '<div class="sidebar-subtitle">Choose from our comprehensive set of asteroid analysis queries.</div>',
+        f"""
+        <div class="section-heading">
+          <span class="icon">🔍</span>
+          <span>{selected_query}</span>
+        </div>
+        <div class="section-heading-sub">
+          Results and visualizations for the selected NEO query.
+        </div>
+        """,
         unsafe_allow_html=True,
     )
-    st.markdown('</div>', unsafe_allow_html=True)
 
-query_categories = {
-    "📈 Statistical Analysis": [
-        "1. Each  asteroid approach Count",
-        "2. Avg_velocity of each",
-        "3. Top 10 fastest asteroids",
-        "11. Approaches per month",
-        "19. Close approach within last 3 days",
-    ],
-    "⚠️ Hazard Assessment": [
-        "4. Hazardous>3 approach",
-        "13. Hazardous vs Non-hazardous count",
-        "24. Count of hazardous asteroids",
-        "22. Avg_miss_distance by hazard type",
-    ],
-    "🏃‍♂️ Speed & Motion": [
-        "6. Fastest approach",
-        "10. Asteroid > 50k km/h",
-    ],
-    "📏 Distance & Size": [
-        "7. Max estimated diameter order",
-        "9. Closest approach date & miss distance",
-        "14. Asteroids < 1 LD",
-        "15. Asteroids < 0.05 AU",
-        "16. Abs_mag range (20-26)",
-        "17. Maximum asteroid diameter",
-        "18. Minimum estimated diameter",
-        "20. Miss_distance_lunar between 70 -120",
-        "23. Top 5 closest approaches",
-    ],
-    "📅 Temporal Analysis": [
-        "5. Most approached month",
-        "8. Order by Miss distance nearer",
-    ],
-    "🌟 More common Queries": [
-        "12. Brightest asteroid",
-        "21. Orbiting bodies (non-Earth)",
-        "25. Frequent <1 LD asteroids",
-    ],
-}
-
-selected_query = None
-for category, queries_list in query_categories.items():
-    with st.sidebar.expander(category):
-        for query_label in queries_list:
-            if st.button(query_label, key=f"btn_{query_label}"):
-                selected_query = query_label
+    show_query(queries[selected_query])
 
-if selected_query is None:
-    selected_query = "1. Each  asteroid approach Count"
+
+query_panel()
 
 # ----------------------------
-# 9. Show selected query (section style)
+# 8. Advanced Filters (modern section heading)
 # ----------------------------
-st.markdown(
-    f"""
-    <div class="section-heading">
-      <span class="icon">🔍</span>
-      <span>{selected_query}</span>
-    </div>
-    <div class="section-heading-sub">
-      Results and visualizations for the selected NEO query.
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+FILTER_ROW_LIMIT = 500
 
-show_query(queries[selected_query])
 
-# ----------------------------
-# 10. Advanced Filters (modern section heading)
-# ----------------------------
-st.markdown(
+@st.fragment
+def filter_panel():
     """
-    <div class="section-heading">
-      <span class="icon">🎛️</span>
-      <span>Advanced Asteroid Approach Filters</span>
-    </div>
-    <div class="section-heading-sub">
-      Customize your search parameters to find specific asteroid approaches.
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+    Filter form plus its results. Applying filters reruns only this
+    fragment, so the hero banner and overview cards are left untouched.
+    """
+    st.markdown(
+        """
+        <div class="section-heading">
+          <span class="icon">🎛️</span>
+          <span>Advanced Asteroid Approach Filters</span>
+        </div>
+        <div class="section-heading-sub">
+          Customize your search parameters to find specific asteroid approaches.
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
 
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("📅 Date & Time Filters")
-    selected_date = st.date_input("Select Close Approach Date (after)", datetime(2024, 1, 1))
-    st.info("📊 Data Range: January 1, 2024 - December 31, 2024")
-
-    st.subheader("🚀 Velocity Filters")
-    min_velocity = st.slider("Minimum Relative Velocity (km/h)", 0.0, 100000.0, 0.0, 1000.0)
-    max_velocity = st.slider("Maximum Relative Velocity (km/h)", 0.0, 100000.0, 50000.0, 1000.0)
-
-    st.subheader("📏 Size Filters")
-    min_diameter = st.slider("Minimum Estimated Diameter (km)", 0.0, 50.0, 0.0, 0.1)
-    max_diameter = st.slider("Maximum Estimated Diameter (km)", 0.0, 50.0, 5.0, 0.1)
-
-with col2:
-    st.subheader("🌍 Distance Filters (Astronomical Units)")
-    min_au = st.slider("Minimum AU", 0.0, 1.0, 0.0, 0.01)
-    max_au = st.slider("Maximum AU", 0.0, 1.0, 0.05, 0.01)
-
-    st.subheader("🌙 Distance Filters (Lunar Distance)")
-    min_ld = st.slider("Minimum LD", 0.0, 100.0, 0.0, 1.0)
-    max_ld = st.slider("Maximum LD", 0.0, 100.0, 10.0, 1.0)
-
-    st.subheader("⚠️ Hazard Classification")
-    hazardous = st.selectbox("Potentially Hazardous?", ["Both", "Yes", "No"])
-
-filter_query = f"""
-SELECT a.name,
-       ca.close_approach_date,
-       ca.relative_velocity_km_per_hour,
-       ca.miss_distance_km,
-       ca.miss_distance_lunar,
-       a.estimated_diameter_min_km,
-       a.estimated_diameter_max_km,
-       a.is_potentially_hazardous_asteroid
-FROM close_approach ca
-JOIN asteroids a ON ca.neo_reference_id = a.id
-WHERE DATE(ca.close_approach_date) >= DATE('{selected_date}')
-  AND ca.astronomical BETWEEN {min_au} AND {max_au}
-  AND ca.miss_distance_lunar BETWEEN {min_ld} AND {max_ld}
-  AND ca.relative_velocity_km_per_hour BETWEEN {min_velocity} AND {max_velocity}
-  AND a.estimated_diameter_max_km BETWEEN {min_diameter} AND {max_diameter}
-"""
-
-if hazardous == "Yes":
-    filter_query += " AND a.is_potentially_hazardous_asteroid = 1"
-elif hazardous == "No":
-    filter_query += " AND a.is_potentially_hazardous_asteroid = 0"
-
-st.markdown("#### 🎯 Filtered Results")
-filtered_df = show_query(filter_query, show_chart=False)
-
-if not filtered_df.empty:
-    st.success(f"✅ Found {len(filtered_df)} asteroids matching your criteria")
-else:
-    st.warning("🔍 No asteroids found matching your criteria. Try adjusting the filters.")
+    # Widgets inside a form only commit on "Apply Filters", so dragging a
+    # slider no longer triggers a rerun + query per intermediate value.
+    with st.form("filter_form"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("📅 Date & Time Filters")
+            selected_date = st.date_input("Select Close Approach Date (after)", datetime(2024, 1, 1))
+            st.info("📊 Data Range: January 1, 2024 - December 31, 2024")
+
+            st.subheader("🚀 Velocity Filters")
+            min_velocity = st.slider("Minimum Relative Velocity (km/h)", 0.0, 100000.0, 0.0, 1000.0)
+            max_velocity = st.slider("Maximum Relative Velocity (km/h)", 0.0, 100000.0, 50000.0, 1000.0)
+
+            st.subheader("📏 Size Filters")
+            min_diameter = st.slider("Minimum Estimated Diameter (km)", 0.0, 50.0, 0.0, 0.1)
+            max_diameter = st.slider("Maximum Estimated Diameter (km)", 0.0, 50.0, 5.0, 0.1)
+
+        with col2:
+            st.subheader("🌍 Distance Filters (Astronomical Units)")
+            min_au = st.slider("Minimum AU", 0.0, 1.0, 0.0, 0.01)
+            max_au = st.slider("Maximum AU", 0.0, 1.0, 0.05, 0.01)
+
+            st.subheader("🌙 Distance Filters (Lunar Distance)")
+            min_ld = st.slider("Minimum LD", 0.0, 100.0, 0.0, 1.0)
+            max_ld = st.slider("Maximum LD", 0.0, 100.0, 10.0, 1.0)
+
+            st.subheader("⚠️ Hazard Classification")
+            hazardous = st.selectbox("Potentially Hazardous?", ["Both", "Yes", "No"])
+
+        submitted = st.form_submit_button("Apply Filters", use_container_width=True)
+
+    # Query only on Apply (or first load); other reruns reuse the stored result
+    if submitted or "filter_summary" not in st.session_state:
+        # Shared FROM/WHERE so the row fetch and the summary stay in sync
+        filter_clause = """
+        FROM close_approach_enriched
+        WHERE close_approach_date >= %s
+          AND astronomical BETWEEN %s AND %s
+          AND miss_distance_lunar BETWEEN %s AND %s
+          AND relative_velocity_km_per_hour BETWEEN %s AND %s
+          AND estimated_diameter_max_km BETWEEN %s AND %s
+        """
+        filter_params = (
+            selected_date,
+            min_au, max_au,
+            min_ld, max_ld,
+            min_velocity, max_velocity,
+            min_diameter, max_diameter,
+        )
+
+        if hazardous == "Yes":
+            filter_clause += " AND is_potentially_hazardous_asteroid = 1"
+        elif hazardous == "No":
+            filter_clause += " AND is_potentially_hazardous_asteroid = 0"
+
+        filter_query = f"""
+        SELECT name,
+               close_approach_date,
+               relative_velocity_km_per_hour,
+               miss_distance_km,
+               miss_distance_lunar,
+               estimated_diameter_min_km,
+               estimated_diameter_max_km,
+               is_potentially_hazardous_asteroid
+        {filter_clause}
+        ORDER BY close_approach_date
+        LIMIT {FILTER_ROW_LIMIT}
+        """
+        filter_summary_query = f"""
+        SELECT COUNT(*) AS count,
+               AVG(relative_velocity_km_per_hour) AS avg_velocity,
+               MIN(miss_distance_lunar) AS min_ld
+        {filter_clause}
+        """
+
+        # Only the one-row summary runs on Apply; rows wait for the toggle
+        st.session_state.pop("filtered_df", None)
+        st.session_state["filter_rows_query"] = (filter_query, filter_params)
+        try:
+            summary_df = local_query(filter_summary_query, filter_params)
+            row = summary_df.iloc[0] if not summary_df.empty else {}
+            summary = {
+                "count": int(row.get("count", 0) or 0),
+                "avg_velocity": row.get("avg_velocity"),
+                "min_ld": row.get("min_ld"),
+            }
+            st.session_state["filter_summary"] = summary
+        except Exception as e:
+            st.error(f"❌ Query execution failed: {e}")
+            st.session_state.pop("filter_summary", None)
+            summary = {"count": 0, "avg_velocity": None, "min_ld": None}
+    else:
+        summary = st.session_state["filter_summary"]
+
+    match_count = summary["count"]
+
+    st.markdown("#### 🎯 Filtered Results")
+    if match_count == 0:
+        st.warning("🔍 No asteroids found matching your criteria. Try adjusting the filters.")
+        return
+
+    st.success(f"✅ Found {match_count:,} asteroids matching your criteria")
+    count_col, velocity_col, ld_col = st.columns(3)
+    count_col.metric("Matching approaches", f"{match_count:,}")
+    velocity_col.metric("Avg velocity (km/h)", f"{float(summary['avg_velocity']):,.0f}")
+    ld_col.metric("Closest approach (LD)", f"{float(summary['min_ld']):.2f}")
+
+    if not st.toggle("Show matching rows", key="filter_show_rows"):
+        return
+
+    if "filtered_df" not in st.session_state:
+        filter_query, filter_params = st.session_state["filter_rows_query"]
+        try:
+            st.session_state["filtered_df"] = local_query(filter_query, filter_params)
+        except Exception as e:
+            st.error(f"❌ Query execution failed: {e}")
+            return
+    filtered_df = st.session_state["filtered_df"]
+
+    st.dataframe(filtered_df, use_container_width=True, height=400)
+    if match_count > len(filtered_df):
+        st.caption(f"Showing the first {len(filtered_df):,} matches by approach date.")
+
+filter_panel()
+
+# Rendered last so the counters include every query on this page
+with st.sidebar.expander("🧮 Query cache stats"):
+    stats = cache_stats()
+    hits = stats["calls"] - stats["misses"]
+    st.write(f"Lookups: {stats['calls']:,}")
+    st.write(f"Database fetches: {stats['misses']:,}")
+    if stats["calls"]:
+        st.write(f"Hit rate: {hits / stats['calls']:.0%}")
 
 # ----------------------------
-# 11. Colab launch instructions
+# 9. Colab launch instructions
 # ----------------------------
 # st.markdown(
 #     """
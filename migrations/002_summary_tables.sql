@@ -0,0 +1,23 @@
+-- One-time migration: pre-aggregated summaries for the temporal and
+-- hazard queries (5, 11, 13). The 2024 data set is closed, so these only
+-- need re-populating after a reload; see refresh_summaries.sql.
+
+CREATE TABLE IF NOT EXISTS monthly_approach_counts (
+    month CHAR(7) PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS hazard_summary (
+    is_potentially_hazardous_asteroid BOOLEAN PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+
+INSERT INTO monthly_approach_counts (month, total)
+SELECT approach_month, COUNT(*)
+FROM close_approach
+GROUP BY approach_month;
+
+INSERT INTO hazard_summary (is_potentially_hazardous_asteroid, total)
+SELECT is_potentially_hazardous_asteroid, COUNT(*)
+FROM asteroids
+GROUP BY is_potentially_hazardous_asteroid;
@@ -0,0 +1,54 @@
+-- One-time migration: denormalized close_approach + asteroids table.
+-- Most sidebar queries and the Advanced Filters panel join every approach to
+-- its asteroid just to read the name, hazard flag or diameter. Storing the
+-- join once lets them scan a single table with its own indexes.
+-- TiDB has no CREATE TABLE ... AS SELECT, so the table is declared and then
+-- filled. Kept current by migrations/refresh_summaries.sql.
+
+CREATE TABLE IF NOT EXISTS close_approach_enriched (
+    neo_reference_id INTEGER,
+    close_approach_date DATE,
+    relative_velocity_km_per_hour FLOAT,
+    astronomical FLOAT,
+    miss_distance_km FLOAT,
+    miss_distance_lunar FLOAT,
+    orbiting_body VARCHAR(255),
+    name VARCHAR(255),
+    estimated_diameter_min_km FLOAT,
+    estimated_diameter_max_km FLOAT,
+    is_potentially_hazardous_asteroid BOOLEAN
+);
+
+INSERT INTO close_approach_enriched
+SELECT ca.neo_reference_id,
+       ca.close_approach_date,
+       ca.relative_velocity_km_per_hour,
+       ca.astronomical,
+       ca.miss_distance_km,
+       ca.miss_distance_lunar,
+       ca.orbiting_body,
+       a.name,
+       a.estimated_diameter_min_km,
+       a.estimated_diameter_max_km,
+       a.is_potentially_hazardous_asteroid
+FROM close_approach ca
+JOIN asteroids a ON ca.neo_reference_id = a.id;
+
+-- Only columns the rewritten queries filter or sort on; every index is
+-- rewritten by the DELETE + INSERT refresh.
+CREATE INDEX ix_cae_lunar ON close_approach_enriched (miss_distance_lunar);                  -- 14, 25
+CREATE INDEX ix_cae_au ON close_approach_enriched (astronomical);                            -- 15
+CREATE INDEX ix_cae_velocity ON close_approach_enriched (relative_velocity_km_per_hour);     -- 10
+CREATE INDEX ix_cae_km ON close_approach_enriched (miss_distance_km);                        -- 23
+CREATE INDEX ix_cae_diameter ON close_approach_enriched (estimated_diameter_max_km);         -- 17
+
+-- Advanced Filters panel: a date lower bound plus AU / LD / velocity ranges.
+-- Leading with the date lets the range scan start at the cut-off, and the
+-- other predicates are checked from the index. Used when the panel queries
+-- TiDB directly (DuckDB not installed); the replica is a plain full copy.
+CREATE INDEX ix_cae_date_au_ld_vel ON close_approach_enriched (
+    close_approach_date,
+    astronomical,
+    miss_distance_lunar,
+    relative_velocity_km_per_hour
+);
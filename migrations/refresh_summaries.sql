@@ -0,0 +1,36 @@
+-- Rebuild the summary tables from the base tables.
+-- TiDB has no event scheduler, so run this from cron after each data load, e.g.
+--   0 3 * * * mysql -h <host> -P 4000 -u <user> -p<password> NASA_NEO < migrations/refresh_summaries.sql
+--
+-- REPLACE INTO upserts on the primary key, so the dashboard never reads a
+-- half-emptied table and unchanged rows are simply rewritten in place.
+
+REPLACE INTO monthly_approach_counts (month, total)
+SELECT approach_month, COUNT(*)
+FROM close_approach
+GROUP BY approach_month;
+
+REPLACE INTO hazard_summary (is_potentially_hazardous_asteroid, total)
+SELECT is_potentially_hazardous_asteroid, COUNT(*)
+FROM asteroids
+GROUP BY is_potentially_hazardous_asteroid;
+
+-- close_approach_enriched has no natural key, so rebuild it inside one
+-- transaction; readers keep seeing the previous rows until the commit.
+START TRANSACTION;
+DELETE FROM close_approach_enriched;
+INSERT INTO close_approach_enriched
+SELECT ca.neo_reference_id,
+       ca.close_approach_date,
+       ca.relative_velocity_km_per_hour,
+       ca.astronomical,
+       ca.miss_distance_km,
+       ca.miss_distance_lunar,
+       ca.orbiting_body,
+       a.name,
+       a.estimated_diameter_min_km,
+       a.estimated_diameter_max_km,
+       a.is_potentially_hazardous_asteroid
+FROM close_approach ca
+JOIN asteroids a ON ca.neo_reference_id = a.id;
+COMMIT;
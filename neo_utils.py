@@ -0,0 +1,967 @@
+"""
+Shared helpers for the NASA NEO dashboard: database access and caching,
+query rendering, the sidebar query catalogue and the stylesheet loader.
+"""
+import hashlib
+import re
+import threading
+from contextlib import contextmanager
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import mysql.connector
+import mysql.connector.pooling
+import pandas as pd
+from pathlib import Path
+import plotly.graph_objects as go
+from urllib.parse import quote
+
+try:
+    import connectorx as cx
+    import pyarrow as pa
+except ImportError:  # optional; see use_connectorx()
+    cx = None
+
+try:
+    import duckdb
+except ImportError:  # filter panel then queries MySQL directly
+    duckdb = None
+
+
+# ----------------------------
+# Styling
+# ----------------------------
+@st.cache_resource
+def get_css():
+    """
+    The <style> block built from styles.css, once per process.
+    cache_resource hands every rerun the same string instead of a copy.
+    """
+    css = (Path(__file__).parent / "styles.css").read_text(encoding="utf-8")
+    return f"<style>{css}</style>"
+
+
+# ----------------------------
+# DB helpers
+# ----------------------------
+def pool_size():
+    return st.secrets.get("pool_size", 8)
+
+
+@st.cache_resource
+def get_pool():
+    """
+    Create the MySQL/TiDB connection pool once per process using Streamlit secrets.
+    """
+    tls = {}
+    if st.secrets.get("ssl_ca"):
+        # Verify the server against the given CA bundle (e.g. TiDB Cloud)
+        tls = {
+            "ssl_ca": st.secrets["ssl_ca"],
+            "ssl_verify_cert": True,
+            "ssl_verify_identity": True,
+        }
+    return mysql.connector.pooling.MySQLConnectionPool(
+        pool_name="neo",
+        pool_size=pool_size(),
+        # Queries never change session state, so skip the reset round-trip
+        # the pool would otherwise issue every time a connection is returned
+        pool_reset_session=False,
+        host=st.secrets["host"],
+        user=st.secrets["user"],
+        password=st.secrets["password"],
+        database=st.secrets["name"],
+        port=st.secrets.get("port", 4000),
+        # Decode rows in the C extension when the wheel ships it; builds
+        # without it fall back to the pure-Python protocol instead of failing
+        use_pure=not mysql.connector.HAVE_CEXT,
+        **tls,
+    )
+
+
+@st.cache_resource
+def pool_slots():
+    """
+    One permit per pooled connection, shared by every session and thread.
+    """
+    return threading.BoundedSemaphore(pool_size())
+
+
+@contextmanager
+def get_connection():
+    """
+    Borrow a pooled connection for a with-block and hand it back afterwards.
+    MySQLConnectionPool raises PoolError instead of waiting when every
+    connection is out, so callers queue on pool_slots() first.
+    """
+    slots = pool_slots()
+    slots.acquire()
+    try:
+        conn = get_pool().get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+    finally:
+        slots.release()
+
+
+@st.cache_resource
+def get_connection_uri():
+    """
+    Build the mysql:// URI used by connectorx from Streamlit secrets.
+    Credentials are URL-quoted, and TLS is required because TiDB Cloud
+    refuses plain-text connections (the pool's driver negotiates it itself).
+    """
+    return (
+        "mysql://{user}:{password}@{host}:{port}/{database}"
+        "?require_ssl=true&verify_ca=true&verify_identity=true"
+    ).format(
+        user=quote(st.secrets["user"], safe=""),
+        password=quote(st.secrets["password"], safe=""),
+        host=st.secrets["host"],
+        port=st.secrets.get("port", 4000),
+        database=st.secrets["name"],
+    )
+
+
+def use_connectorx():
+    """
+    connectorx opens its own connection per read, outside the pool, so it
+    is only used when installed and enabled with connectorx = true in secrets.
+    """
+    return cx is not None and st.secrets.get("connectorx", False)
+
+
+# Rows pulled per fetchmany() round; also used as the cursor arraysize
+FETCH_SIZE = 10_000
+
+
+def downcast_floats(df):
+    """
+    float64 -> float32 in place. Safe per fetch chunk, unlike category.
+    """
+    for col in df.select_dtypes("float64").columns:
+        df[col] = df[col].astype("float32")
+    return df
+
+
+def downcast_frame(df):
+    """
+    Shrink a fetched frame in place: float64 -> float32, hazard flag -> uint8,
+    asteroid names -> category. Halves what st.dataframe/Plotly serialize.
+    """
+    downcast_floats(df)
+    flag = "is_potentially_hazardous_asteroid"
+    if flag in df.columns and df[flag].notna().all():
+        df[flag] = df[flag].astype("uint8")
+    if "name" in df.columns:
+        df["name"] = df["name"].astype("category")
+    return df
+
+
+def fetch_dataframe(sql, params=None):
+    """
+    Run a SELECT query and return a pandas DataFrame with compact dtypes.
+    Errors are raised to the caller instead of being shown here.
+    """
+    # Floats shrink before pandas sees them, so a full float64 copy never exists
+    return downcast_frame(read_dataframe(sql, params, float32=True))
+
+
+def _float32_schema(schema):
+    return pa.schema(
+        [
+            field.with_type(pa.float32()) if pa.types.is_float64(field.type) else field
+            for field in schema
+        ]
+    )
+
+
+def read_dataframe(sql, params=None, float32=False):
+    """
+    With connectorx enabled, plain queries are read straight into Arrow
+    buffers; everything else uses the pooled cursor, streaming rows in
+    FETCH_SIZE batches. float32=True narrows float64 columns on the Arrow
+    table or on each batch, before the full frame is assembled.
+    Parameterized queries run as server-side prepared statements, so TiDB
+    can reuse the cached plan across slider values instead of re-planning.
+    """
+    if not params and use_connectorx():
+        table = cx.read_sql(
+            get_connection_uri(), sql.strip().rstrip(";"), return_type="arrow"
+        )
+        if float32:
+            table = table.cast(_float32_schema(table.schema))
+        # Release each Arrow column as soon as it is converted, so the
+        # Arrow and pandas copies of the result never coexist in full
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    with get_connection() as conn:
+        if params:
+            cursor = conn.cursor(prepared=True)
+        else:
+            cursor = conn.cursor(buffered=False)
+        cursor.arraysize = FETCH_SIZE
+        try:
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                chunk = pd.DataFrame.from_records(
+                    rows, columns=columns, coerce_float=True
+                )
+                del rows
+                chunks.append(downcast_floats(chunk) if float32 else chunk)
+        finally:
+            cursor.close()
+
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+@st.cache_resource
+def cache_stats():
+    """
+    Process-wide counters behind the sidebar's cache hit-rate readout.
+    """
+    return {"calls": 0, "misses": 0}
+
+
+# Prewarm threads update the counters concurrently with user sessions
+_stats_lock = threading.Lock()
+
+
+def _count(key):
+    with _stats_lock:
+        cache_stats()[key] += 1
+
+
+# Sidebar/filter results expire after 10 minutes; overview counts after an hour
+QUERY_CACHE_TTL = 600
+OVERVIEW_CACHE_TTL = 3600
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def _fetch(sql, params=None):
+    # Body only runs on a cache miss
+    _count("misses")
+    return fetch_dataframe(sql, params)
+
+
+def cached_query(sql: str, params: tuple = None) -> pd.DataFrame:
+    """
+    Memoized fetch_dataframe, keyed on the SQL text and params.
+    Failed queries raise and are therefore never cached.
+    """
+    _count("calls")
+    return _fetch(sql, params)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner="Preparing CSV...")
+def query_csv(sql):
+    """
+    CSV export of a query's full result, keyed on SQL text rather than the
+    DataFrame. The frame is dropped once encoded; only the bytes are cached.
+    """
+    base = sql.strip().rstrip(";").rstrip()
+    return read_dataframe(base).to_csv(index=False).encode("utf-8")
+
+
+@st.cache_resource(ttl=24 * 3600, show_spinner="Loading local asteroid replica...")
+def get_replica():
+    """
+    In-process DuckDB copy of close_approach_enriched, rebuilt once a day.
+    The filter panel runs against it so slider changes never hit the network.
+    """
+    con = duckdb.connect(":memory:")
+    con.register(
+        "enriched_src", read_dataframe("SELECT * FROM close_approach_enriched")
+    )
+    # Keep the hazard flag numeric so "= 1" / "= 0" filters match MySQL
+    con.execute(
+        """
+        CREATE TABLE close_approach_enriched AS
+        SELECT * REPLACE (
+            CAST(is_potentially_hazardous_asteroid AS INTEGER)
+                AS is_potentially_hazardous_asteroid
+        )
+        FROM enriched_src
+        """
+    )
+    con.unregister("enriched_src")
+    return con
+
+
+def replica_query(sql, params=None):
+    """
+    Run a %s-parameterized query against the DuckDB replica.
+    """
+    cursor = get_replica().cursor()
+    try:
+        return downcast_frame(
+            cursor.execute(sql.replace("%s", "?"), list(params or ())).df()
+        )
+    finally:
+        cursor.close()
+
+
+def local_query(sql, params=None):
+    """
+    Interactive filters: DuckDB replica when available, else cached MySQL.
+    """
+    if duckdb is not None:
+        return replica_query(sql, params)
+    return cached_query(sql, params)
+
+
+def clear_query_cache():
+    """
+    Drop every memoized result so the next reads go to the database.
+    """
+    # Stop the running prewarm first: it would otherwise refill the caches
+    # with old rows and overlap the next prewarm, exceeding its pool share
+    executor = prewarm_state()["executor"]
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    _fetch.clear()
+    query_csv.clear()
+    get_overview.clear()
+    get_replica.clear()
+    prewarm_query_cache.clear()
+
+
+def with_script_ctx(fn):
+    """
+    Wrap fn so a worker thread runs it inside the current script run's
+    context (needed for st.cache_data and st.secrets lookups off-thread).
+    """
+    ctx = get_script_run_ctx()
+
+    def wrapper(*args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+# ----------------------------
+# Helper to run + show queries
+# ----------------------------
+class ChartKind(Enum):
+    """
+    Chart drawn under a query's result table.
+    """
+    NONE = "none"
+    BAR = "bar"  # top "limit" rows, "x" labels against "y" values
+    HIST = "hist"  # distribution of the "x" column
+
+
+# Rows per table page; only one page is fetched and rendered at a time
+PAGE_SIZE = 1000
+
+# Rows a bar chart plots; only these are fetched for the chart
+CHART_LIMIT = 10
+
+# Histograms are binned in SQL, so only this many rows reach the browser
+HIST_BINS = 30
+
+# A trailing LIMIT means the query bounds itself and is paged locally
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+)$", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+
+
+def page_state_key(sql):
+    return "page_" + hashlib.md5(sql.encode("utf-8")).hexdigest()
+
+
+def current_page(sql):
+    """
+    Zero-based page of sql the user is viewing in this session.
+    """
+    return st.session_state.get(page_state_key(sql), 0)
+
+
+def _page_query(sql, page):
+    """
+    (query, offset) that fetch_page reads for page: ordered queries page on
+    the server with LIMIT/OFFSET, so their ORDER BY must be a total order
+    (end on a unique key) or pages can overlap. Queries with their own LIMIT,
+    or no ORDER BY at all, are fetched whole and sliced locally at offset.
+    """
+    base = sql.strip().rstrip(";").rstrip()
+    start = page * PAGE_SIZE
+    if _TRAILING_LIMIT.search(base) or not _ORDER_BY.search(base):
+        return base, start
+    # One extra row tells us whether another page exists
+    return f"{base}\nLIMIT {PAGE_SIZE + 1} OFFSET {start}", 0
+
+
+def fetch_page(sql, page):
+    """
+    Return (rows, has_next) for one PAGE_SIZE page of a query.
+    """
+    query, offset = _page_query(sql, page)
+    df = cached_query(query)
+    return df.iloc[offset:offset + PAGE_SIZE], len(df) > offset + PAGE_SIZE
+
+
+def prefetch_page(sql, page):
+    """
+    Load fetch_page's result into the query cache without counting a lookup,
+    so a prefetched page view still reads as one lookup in the cache stats.
+    """
+    _fetch(_page_query(sql, page)[0], None)
+
+
+def limit_sql(sql, limit):
+    """
+    sql capped at its first limit rows, keeping the query's own ORDER BY.
+    An existing trailing LIMIT is replaced only when it is larger.
+    """
+    base = sql.strip().rstrip(";").rstrip()
+    match = _TRAILING_LIMIT.search(base)
+    if match:
+        if int(match.group(1)) <= limit:
+            return base
+        base = base[:match.start()].rstrip()
+    return f"{base}\nLIMIT {limit}"
+
+
+def histogram_sql(sql, column, bins=HIST_BINS):
+    """
+    sql's full result binned on column into equal-width buckets:
+    one (bin_center, count) row per non-empty bucket.
+    """
+    base = sql.strip().rstrip(";").rstrip()
+    return f"""
+    WITH src AS (
+    {base}
+    ), span AS (
+        SELECT MIN({column}) AS lo, (MAX({column}) - MIN({column})) / {bins} AS width
+        FROM src
+    )
+    SELECT span.lo + (LEAST(COALESCE(FLOOR((src.{column} - span.lo)
+                / NULLIF(span.width, 0)), 0), {bins - 1}) + 0.5) * span.width
+               AS bin_center,
+           COUNT(*) AS count
+    FROM src CROSS JOIN span
+    WHERE src.{column} IS NOT NULL
+    GROUP BY bin_center
+    ORDER BY bin_center
+    """
+
+
+def _turn_page(key, step):
+    st.session_state[key] = max(st.session_state.get(key, 0) + step, 0)
+
+
+def chart_figure(sql, trace_type, title, x_title, y_title):
+    """
+    Return this session's figure for the given query, building it on first use.
+    Callers only swap the trace data, so layout is never rebuilt on reruns.
+    """
+    figures = st.session_state.setdefault("figures", {})
+    key = hashlib.md5(sql.encode("utf-8")).hexdigest()
+    if key not in figures:
+        figures[key] = go.Figure(
+            data=[trace_type()],
+            layout=dict(
+                title=title,
+                height=400,
+                xaxis_title=x_title,
+                yaxis_title=y_title,
+            ),
+        )
+    return figures[key]
+
+
+def show_query(entry, chart_key="query_chart"):
+    """
+    Run a query entry (see queries below), show results as a paged table,
+    and draw the entry's chart. Bar charts fetch only their "limit" rows
+    from the server; histograms are binned in SQL over the full result.
+    The chart keeps a stable element key so reruns update it in place.
+    """
+    sql = entry["sql"]
+    chart = entry.get("chart_kind", ChartKind.NONE)
+    try:
+        key = page_state_key(sql)
+        page = current_page(sql)
+        df, has_next = fetch_page(sql, page)
+
+        if df.empty and page == 0:
+            st.warning("No data returned for this query.")
+            return df
+
+        st.dataframe(df, use_container_width=True, height=400)
+
+        if page > 0 or has_next:
+            prev_col, info_col, next_col = st.columns([1, 3, 1])
+            prev_col.button(
+                "⬅️ Previous",
+                key=f"prev_{key}",
+                disabled=page == 0,
+                on_click=_turn_page,
+                args=(key, -1),
+            )
+            info_col.caption(
+                f"Rows {page * PAGE_SIZE + 1:,}–{page * PAGE_SIZE + len(df):,}"
+            )
+            next_col.button(
+                "Next ➡️",
+                key=f"next_{key}",
+                disabled=not has_next,
+                on_click=_turn_page,
+                args=(key, 1),
+            )
+            # The full result is only read and encoded when asked for
+            if st.button("📄 Prepare full CSV", key=f"csv_{key}"):
+                st.download_button(
+                    "⬇️ Download full CSV",
+                    data=query_csv(sql),
+                    file_name="neo_query.csv",
+                    mime="text/csv",
+                )
+
+        if chart is ChartKind.NONE:
+            return df
+
+        x = entry["x"]
+        if chart is ChartKind.BAR:
+            limit = entry.get("limit", CHART_LIMIT)
+            y = entry["y"]
+            top = cached_query(limit_sql(sql, limit))
+            fig = chart_figure(
+                sql,
+                go.Bar,
+                title=f"Top {limit} - {y.replace('_', ' ').title()}",
+                x_title=x,
+                y_title=y,
+            )
+            fig.data[0].x = top[x]
+            fig.data[0].y = top[y]
+        elif chart is ChartKind.HIST:
+            bins = cached_query(histogram_sql(sql, x))
+            fig = chart_figure(
+                sql,
+                go.Bar,
+                title=f"Distribution of {x.replace('_', ' ').title()}",
+                x_title=x,
+                y_title="count",
+            )
+            fig.data[0].x = bins["bin_center"]
+            fig.data[0].y = bins["count"]
+        st.plotly_chart(fig, use_container_width=True, key=chart_key)
+
+        return df
+
+    except Exception as e:
+        st.error(f"❌ Query execution failed: {e}")
+        return pd.DataFrame()
+
+
+# ----------------------------
+# Query definitions
+# ----------------------------
+# Overview metrics in a single round-trip; asteroids is scanned once and
+# the hazard rate is computed server-side
+SQL_OVERVIEW = """
+    SELECT
+        ov.total,
+        (SELECT COUNT(*) FROM close_approach) AS approaches,
+        ov.hazardous,
+        COALESCE(ov.hazardous * 100.0 / NULLIF(ov.total, 0), 0) AS hazard_pct
+    FROM (
+        SELECT
+            COUNT(DISTINCT id) AS total,
+            COALESCE(SUM(is_potentially_hazardous_asteroid = 1), 0) AS hazardous
+        FROM asteroids
+    ) AS ov
+"""
+
+
+@st.cache_data(ttl=OVERVIEW_CACHE_TTL, show_spinner=False)
+def get_overview():
+    """
+    Overview metric values as plain numbers; zeros when the tables are empty.
+    """
+    df = fetch_dataframe(SQL_OVERVIEW)
+    if df.empty:
+        return {"total": 0, "approaches": 0, "hazardous": 0, "hazard_pct": 0.0}
+    row = df.iloc[0]
+    return {
+        "total": int(row["total"]),
+        "approaches": int(row["approaches"]),
+        "hazardous": int(row["hazardous"]),
+        "hazard_pct": float(row["hazard_pct"]),
+    }
+
+
+# label -> query entry: "sql", "chart_kind", and for charted queries the
+# "x" / "y" result columns plus, for bar charts, the row "limit" to plot.
+# Chart roles are fixed up front instead of guessed from the result.
+queries = {
+    "1. Each  asteroid approach Count": {
+        "sql": """
+        SELECT neo_reference_id, COUNT(*) AS approach_count
+        FROM close_approach
+        GROUP BY neo_reference_id
+        ORDER BY approach_count DESC
+        LIMIT 100
+        """,
+        "chart_kind": ChartKind.BAR,
+        "x": "neo_reference_id",
+        "y": "approach_count",
+        "limit": CHART_LIMIT,
+    },
+    "2. Avg_velocity of each": {
+        "sql": """
+        SELECT neo_reference_id, AVG(relative_velocity_km_per_hour) AS avg_velocity
+        FROM close_approach
+        GROUP BY neo_reference_id
+        ORDER BY avg_velocity DESC, neo_reference_id
+        """,
+        "chart_kind": ChartKind.HIST,
+        "x": "avg_velocity",
+    },
+    "3. Top 10 fastest asteroids": {
+        "sql": """
+        SELECT neo_reference_id, MAX(relative_velocity_km_per_hour) AS max_velocity
+        FROM close_approach
+        GROUP BY neo_reference_id
+        ORDER BY max_velocity DESC
+        LIMIT 10
+        """,
+        "chart_kind": ChartKind.HIST,
+        "x": "max_velocity",
+    },
+    "4. Hazardous>3 approach": {
+        "sql": """
+        SELECT neo_reference_id, COUNT(*) AS approach_count
+        FROM close_approach_enriched
+        WHERE is_potentially_hazardous_asteroid = 1
+        GROUP BY neo_reference_id
+        HAVING COUNT(*) > 3
+        ORDER BY approach_count DESC, neo_reference_id
+        """,
+        "chart_kind": ChartKind.BAR,
+        "x": "neo_reference_id",
+        "y": "approach_count",
+        "limit": CHART_LIMIT,
+    },
+    "5. Most approached month": {
+        "sql": """
+        SELECT month, total AS count
+        FROM monthly_approach_counts
+        ORDER BY total DESC
+        LIMIT 1
+        """,
+        "chart_kind": ChartKind.BAR,
+        "x": "month",
+        "y": "count",
+        "limit": CHART_LIMIT,
+    },
+    "6. Fastest approach": {
+        "sql": """
+        SELECT neo_reference_id, MAX(relative_velocity_km_per_hour) AS fastest_speed
+        FROM close_approach
+        GROUP BY neo_reference_id
+        ORDER BY fastest_speed DESC
+        LIMIT 1
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "7. Max estimated diameter order": {
+        "sql": """
+        SELECT id, name, estimated_diameter_max_km
+        FROM asteroids
+        ORDER BY estimated_diameter_max_km DESC, id
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "8. Order by Miss distance nearer": {
+        "sql": """
+        SELECT neo_reference_id,
+               close_approach_date,
+               miss_distance_km,
+               relative_velocity_km_per_hour
+        FROM close_approach
+        ORDER BY neo_reference_id, close_approach_date
+        LIMIT 5000
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "9. Closest approach date & miss distance": {
+        "sql": """
+        SELECT name,
+               close_approach_date,
+               MIN(miss_distance_km) AS closest_approach
+        FROM close_approach_enriched
+        GROUP BY neo_reference_id, name, close_approach_date
+        ORDER BY closest_approach ASC, neo_reference_id, close_approach_date
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "10. Asteroid > 50k km/h": {
+        "sql": """
+        SELECT DISTINCT name, relative_velocity_km_per_hour
+        FROM close_approach_enriched
+        WHERE relative_velocity_km_per_hour > 50000
+        ORDER BY relative_velocity_km_per_hour DESC, name
+        """,
+        "chart_kind": ChartKind.HIST,
+        "x": "relative_velocity_km_per_hour",
+    },
+    "11. Approaches per month": {
+        "sql": """
+        SELECT month, total
+        FROM monthly_approach_counts
+        ORDER BY total DESC, month
+        """,
+        "chart_kind": ChartKind.BAR,
+        "x": "month",
+        "y": "total",
+        "limit": CHART_LIMIT,
+    },
+    "12. Brightest asteroid": {
+        "sql": """
+        SELECT id, name, absolute_magnitude_h
+        FROM asteroids
+        ORDER BY absolute_magnitude_h ASC
+        LIMIT 1
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "13. Hazardous vs Non-hazardous count": {
+        "sql": """
+        SELECT is_potentially_hazardous_asteroid, total AS count
+        FROM hazard_summary
+        ORDER BY is_potentially_hazardous_asteroid
+        """,
+        "chart_kind": ChartKind.BAR,
+        "x": "is_potentially_hazardous_asteroid",
+        "y": "count",
+        "limit": CHART_LIMIT,
+    },
+    "14. Asteroids < 1 LD": {
+        "sql": """
+        SELECT name,
+               close_approach_date,
+               miss_distance_lunar
+        FROM close_approach_enriched
+        WHERE miss_distance_lunar < 1
+        ORDER BY miss_distance_lunar, neo_reference_id, close_approach_date
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "15. Asteroids < 0.05 AU": {
+        "sql": """
+        SELECT name,
+               close_approach_date,
+               astronomical
+        FROM close_approach_enriched
+        WHERE astronomical < 0.05
+        ORDER BY astronomical, neo_reference_id, close_approach_date
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "16. Abs_mag range (20-26)": {
+        "sql": """
+        SELECT COUNT(*) AS asteroid_count
+        FROM asteroids
+        WHERE absolute_magnitude_h BETWEEN 20 AND 26;
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "17. Maximum asteroid diameter": {
+        "sql": """
+        SELECT
+        neo_reference_id AS id,
+        name,
+        estimated_diameter_max_km,
+        close_approach_date,
+        miss_distance_km
+        FROM close_approach_enriched
+        ORDER BY
+        estimated_diameter_max_km DESC, close_approach_date ASC, neo_reference_id;
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "18. Minimum estimated diameter": {
+        "sql": """
+        SELECT
+        id,
+        name,
+        estimated_diameter_min_km
+        FROM asteroids
+        ORDER BY estimated_diameter_min_km DESC, id;
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "19. Close approach within last 3 days": {
+        "sql": """
+        SELECT
+        COUNT(*) AS approaches_last_3_days
+        FROM close_approach
+        WHERE close_approach_date >= CURDATE() - INTERVAL 3 DAY
+        AND close_approach_date <= CURDATE()
+        AND orbiting_body = 'Earth';
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "20. Miss_distance_lunar between 70 -120": {
+        "sql": """
+        SELECT 
+        neo_reference_id,
+        close_approach_date,
+        miss_distance_lunar,
+        miss_distance_km
+        FROM close_approach
+        WHERE miss_distance_lunar BETWEEN 70 AND 120
+        ORDER BY miss_distance_lunar ASC, neo_reference_id, close_approach_date;
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "21. Orbiting bodies (non-Earth)": {
+        "sql": """
+        SELECT orbiting_body, COUNT(*) AS count
+        FROM close_approach
+        WHERE orbiting_body != 'Earth'
+        GROUP BY orbiting_body
+        ORDER BY count DESC, orbiting_body
+        """,
+        "chart_kind": ChartKind.BAR,
+        "x": "orbiting_body",
+        "y": "count",
+        "limit": CHART_LIMIT,
+    },
+    "22. Avg_miss_distance by hazard type": {
+        "sql": """
+        SELECT is_potentially_hazardous_asteroid,
+               AVG(miss_distance_km) AS avg_miss_distance
+        FROM close_approach_enriched
+        GROUP BY is_potentially_hazardous_asteroid
+        ORDER BY is_potentially_hazardous_asteroid
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "23. Top 5 closest approaches": {
+        "sql": """
+        SELECT name,
+               close_approach_date,
+               miss_distance_km
+        FROM close_approach_enriched
+        ORDER BY miss_distance_km ASC
+        LIMIT 5
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "24. Count of hazardous asteroids": {
+        "sql": """
+        SELECT COUNT(DISTINCT id) AS hazardous_asteroid_count
+        FROM asteroids
+        WHERE is_potentially_hazardous_asteroid = 1
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+    "25. Frequent <1 LD asteroids": {
+        "sql": """
+        SELECT neo_reference_id,
+               name,
+               COUNT(*) AS close_pass_count
+        FROM close_approach_enriched
+        WHERE miss_distance_lunar < 1
+        GROUP BY neo_reference_id, name
+        HAVING COUNT(*) > 1
+        ORDER BY close_pass_count DESC, neo_reference_id
+        """,
+        "chart_kind": ChartKind.NONE,
+    },
+}
+
+
+# Sidebar grouping of the queries above; like queries, built once on import
+# rather than on every script rerun
+query_categories = {
+    "📈 Statistical Analysis": [
+        "1. Each  asteroid approach Count",
+        "2. Avg_velocity of each",
+        "3. Top 10 fastest asteroids",
+        "11. Approaches per month",
+        "19. Close approach within last 3 days",
+    ],
+    "⚠️ Hazard Assessment": [
+        "4. Hazardous>3 approach",
+        "13. Hazardous vs Non-hazardous count",
+        "24. Count of hazardous asteroids",
+        "22. Avg_miss_distance by hazard type",
+    ],
+    "🏃‍♂️ Speed & Motion": [
+        "6. Fastest approach",
+        "10. Asteroid > 50k km/h",
+    ],
+    "📏 Distance & Size": [
+        "7. Max estimated diameter order",
+        "9. Closest approach date & miss distance",
+        "14. Asteroids < 1 LD",
+        "15. Asteroids < 0.05 AU",
+        "16. Abs_mag range (20-26)",
+        "17. Maximum asteroid diameter",
+        "18. Minimum estimated diameter",
+        "20. Miss_distance_lunar between 70 -120",
+        "23. Top 5 closest approaches",
+    ],
+    "📅 Temporal Analysis": [
+        "5. Most approached month",
+        "8. Order by Miss distance nearer",
+    ],
+    "🌟 More common Queries": [
+        "12. Brightest asteroid",
+        "21. Orbiting bodies (non-Earth)",
+        "25. Frequent <1 LD asteroids",
+    ],
+}
+
+
+# At most half the pool, leaving connections for the page's own queries
+PREWARM_WORKERS = 4
+
+
+@st.cache_resource
+def prewarm_state():
+    """
+    Process-wide handle on the latest prewarm executor; it outlives
+    prewarm_query_cache.clear() so clear_query_cache can stop it.
+    """
+    return {"executor": None}
+
+
+@st.cache_resource
+def prewarm_query_cache():
+    """
+    Run every sidebar query once in background threads so the first clicks
+    hit a warm cache. Runs once per process (again after clear_query_cache)
+    and does not block the page.
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(PREWARM_WORKERS, pool_size() // 2)),
+        thread_name_prefix="neo-prewarm",
+    )
+    warm_page = with_script_ctx(fetch_page)
+    warm_query = with_script_ctx(cached_query)
+    for entry in queries.values():
+        executor.submit(warm_page, entry["sql"], 0)
+        if entry["chart_kind"] is ChartKind.BAR:
+            executor.submit(warm_query, limit_sql(entry["sql"], entry["limit"]))
+        elif entry["chart_kind"] is ChartKind.HIST:
+            executor.submit(warm_query, histogram_sql(entry["sql"], entry["x"]))
+    executor.shutdown(wait=False)
+    prewarm_state()["executor"] = executor
+    return executor